@@ -6,11 +6,140 @@ Test script to run all test files in tests\test_edi_835_files and save JSON outp
 
 import os
 import json
+import hashlib
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from datetime import datetime
+from time import perf_counter_ns
+from typing import Optional, Tuple
 import edi_835_parser
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj, indent: bool = True) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(blob: bytes):
+    """Deserialize JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(blob)
+    return json.loads(blob)
+
+
+@lru_cache(maxsize=None)
+def _parser_stamp() -> int:
+    """Latest modification time of the parser sources, so cached outputs expire when the parser changes"""
+    package_dir = Path(edi_835_parser.__file__).parent
+    return max(path.stat().st_mtime_ns for path in package_dir.rglob('*.py'))
+
+
+def _cached_parse_to_json(test_file: Path, cache_dir: Path) -> Tuple[dict, bytes, bool]:
+    """Parse a test file to JSON, reusing the cached output while the file and the parser are unchanged.
+    Returns the JSON data, its serialized bytes and whether they came from the cache"""
+    stat = test_file.stat()
+    key = f'{test_file.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{_parser_stamp()}'
+    cache_file = cache_dir / f"{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}.json"
+    
+    try:
+        blob = cache_file.read_bytes()
+        return _loads(blob), blob, True
+    except (OSError, ValueError):
+        # Missing or unreadable entries (e.g. left truncated by an interrupted run) are parsed again
+        pass
+    
+    json_data = edi_835_parser.parse_to_json(str(test_file))
+    blob = _dumps(json_data)
+    
+    # Write to a temporary file and rename it into place so other workers never see a partial entry
+    temp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+    try:
+        temp_file.write_bytes(blob)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        # The file parsed fine, failing to cache it only means it is parsed again next run
+        try:
+            temp_file.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return json_data, blob, False
+
+
+def _parse_one(test_file: Path, output_dir: Path) -> Tuple[dict, Optional[bytes]]:
+    """Parse a single test file, returning its test result and the serialized JSON output"""
+    try:
+        # Parse to JSON
+        start_time = perf_counter_ns()
+        json_data, blob, cached = _cached_parse_to_json(test_file, output_dir / '.cache')
+        # Loading a cached output says nothing about parse time, so cached results report no timing
+        processing_time = None if cached else (perf_counter_ns() - start_time) / 1e9
+        
+        # Count data structures
+        interchange = json_data.get("interchange", {})
+        transactions = interchange.get("transactions", [])
+        
+        total_claims = 0
+        total_services = 0
+        
+        for transaction in transactions:
+            clp_loops = transaction.get("CLP_loop", [])
+            total_claims += len(clp_loops)
+            
+            for clp_loop in clp_loops:
+                svc_loops = clp_loop.get("SVC_loop", [])
+                total_services += len(svc_loops)
+        
+        # Create safe filename for output
+        safe_name = test_file.stem.replace(' ', '_').replace('-', '_').replace('.', '_')
+        output_file = output_dir / f"{safe_name}_output.json"
+        
+        # Test result
+        test_result = {
+            'file': test_file.name,
+            'status': 'SUCCESS',
+            'output_file': str(output_file),
+            'processing_time': processing_time,
+            'cached': cached,
+            'file_size': test_file.stat().st_size,
+            'transactions': len(transactions),
+            'claims': total_claims,
+            'services': total_services,
+            'error': None
+        }
+        
+        return test_result, blob
+        
+    except Exception as e:
+        # Test failed
+        test_result = {
+            'file': test_file.name,
+            'status': 'FAILED',
+            'output_file': None,
+            'processing_time': 0,
+            'cached': False,
+            'file_size': test_file.stat().st_size if test_file.exists() else 0,
+            'transactions': 0,
+            'claims': 0,
+            'services': 0,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+        
+        return test_result, None
+
+
 def create_test_runner():
     """Run all test files and save JSON outputs"""
     
@@ -23,12 +152,16 @@ def create_test_runner():
     # Create output directory
     output_dir.mkdir(exist_ok=True)
     
+    # Parsed outputs are cached between runs, keyed on file path, mtime and size
+    (output_dir / '.cache').mkdir(exist_ok=True)
+    
     # Get all test files
     if not test_dir.exists():
         print(f"❌ Test directory not found: {test_dir}")
         return
     
-    test_files = [f for f in test_dir.iterdir() if f.is_file() and not f.name.startswith('.')]
+    with os.scandir(test_dir) as entries:
+        test_files = [Path(e.path) for e in entries if e.is_file() and not e.name.startswith('.')]
     
     print("🧪 EDI 835 PARSER - COMPREHENSIVE TEST RUNNER")
     print("=" * 80)
@@ -42,103 +175,45 @@ def create_test_runner():
     successful_tests = 0
     failed_tests = 0
     
-    # Process each test file
-    for test_file in sorted(test_files):
-        print(f"\n🔍 Testing: {test_file.name}")
-        
-        try:
-            # Parse to JSON
-            start_time = datetime.now()
-            json_data = edi_835_parser.parse_to_json(str(test_file))
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
-            
-            # Count data structures
-            interchange = json_data.get("interchange", {})
-            transactions = interchange.get("transactions", [])
-            
-            total_claims = 0
-            total_services = 0
+    # JSON report, streamed as one JSON object per line (NDJSON) followed by a summary line
+    report_file = output_dir / "test_summary_report.ndjson"
+    summary_file = output_dir / "test_summary.txt"
+    
+    # Parse files in parallel; output files are written here in the main process
+    parse_one = partial(_parse_one, output_dir=output_dir)
+    with ProcessPoolExecutor() as executor, open(report_file, 'wb') as report_fp:
+        for test_result, blob in executor.map(parse_one, sorted(test_files), chunksize=4):
+            print(f"\n🔍 Testing: {test_result['file']}")
             
-            for transaction in transactions:
-                clp_loops = transaction.get("CLP_loop", [])
-                total_claims += len(clp_loops)
+            if test_result['status'] == 'SUCCESS':
+                Path(test_result['output_file']).write_bytes(blob)
                 
-                for clp_loop in clp_loops:
-                    svc_loops = clp_loop.get("SVC_loop", [])
-                    total_services += len(svc_loops)
-            
-            # Create safe filename for output
-            safe_name = test_file.stem.replace(' ', '_').replace('-', '_').replace('.', '_')
-            output_file = output_dir / f"{safe_name}_output.json"
-            
-            # Save JSON output
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
-            
-            # Test result
-            test_result = {
-                'file': test_file.name,
-                'status': 'SUCCESS',
-                'output_file': str(output_file),
-                'processing_time': processing_time,
-                'file_size': test_file.stat().st_size,
-                'transactions': len(transactions),
-                'claims': total_claims,
-                'services': total_services,
-                'error': None
-            }
-            
-            print(f"  ✅ SUCCESS")
-            print(f"     ⏱️  Processing time: {processing_time:.3f}s")
-            print(f"     📊 Transactions: {len(transactions)}")
-            print(f"     📋 Claims: {total_claims}")
-            print(f"     🔧 Services: {total_services}")
-            print(f"     💾 Output: {output_file}")
-            
-            successful_tests += 1
-            
-        except Exception as e:
-            # Test failed
-            error_msg = str(e)
-            traceback_str = traceback.format_exc()
-            
-            test_result = {
-                'file': test_file.name,
-                'status': 'FAILED',
-                'output_file': None,
-                'processing_time': 0,
-                'file_size': test_file.stat().st_size if test_file.exists() else 0,
-                'transactions': 0,
-                'claims': 0,
-                'services': 0,
-                'error': error_msg,
-                'traceback': traceback_str
-            }
+                print(f"  ✅ SUCCESS")
+                if test_result['cached']:
+                    print("     ⏱️  Processing time: cached")
+                else:
+                    print(f"     ⏱️  Processing time: {test_result['processing_time']:.3f}s")
+                print(f"     📊 Transactions: {test_result['transactions']}")
+                print(f"     📋 Claims: {test_result['claims']}")
+                print(f"     🔧 Services: {test_result['services']}")
+                print(f"     💾 Output: {test_result['output_file']}")
+                
+                successful_tests += 1
+            else:
+                print(f"  ❌ FAILED: {test_result['error']}")
+                failed_tests += 1
             
-            print(f"  ❌ FAILED: {error_msg}")
-            failed_tests += 1
+            report_fp.write(_dumps({'type': 'result', **test_result}, indent=False) + b'\n')
+            results.append(test_result)
         
-        results.append(test_result)
-    
-    # Generate summary report
-    report_file = output_dir / "test_summary_report.json"
-    summary_file = output_dir / "test_summary.txt"
-    
-    # JSON report
-    summary_data = {
-        'test_run': {
+        report_fp.write(_dumps({
+            'type': 'summary',
             'timestamp': datetime.now().isoformat(),
             'total_files': len(test_files),
             'successful': successful_tests,
             'failed': failed_tests,
             'success_rate': (successful_tests / len(test_files) * 100) if test_files else 0
-        },
-        'results': results
-    }
-    
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(summary_data, f, indent=2, ensure_ascii=False)
+        }, indent=False) + b'\n')
     
     # Text summary
     with open(summary_file, 'w', encoding='utf-8') as f:
@@ -166,7 +241,10 @@ def create_test_runner():
             f.write(f"Status: {result['status']}\n")
             
             if result['status'] == 'SUCCESS':
-                f.write(f"  Processing Time: {result['processing_time']:.3f}s\n")
+                if result['cached']:
+                    f.write("  Processing Time: cached\n")
+                else:
+                    f.write(f"  Processing Time: {result['processing_time']:.3f}s\n")
                 f.write(f"  File Size: {result['file_size']:,} bytes\n")
                 f.write(f"  Transactions: {result['transactions']}\n")
                 f.write(f"  Claims: {result['claims']}\n")
@@ -193,7 +271,9 @@ def create_test_runner():
     total_transactions = sum(r['transactions'] for r in results if r['status'] == 'SUCCESS')
     total_claims = sum(r['claims'] for r in results if r['status'] == 'SUCCESS')
     total_services = sum(r['services'] for r in results if r['status'] == 'SUCCESS')
-    total_processing_time = sum(r['processing_time'] for r in results if r['status'] == 'SUCCESS')
+    # Cached results were not parsed this run, so only parsed files count towards the processing time
+    parsed_results = [r for r in results if r['status'] == 'SUCCESS' and not r['cached']]
+    total_processing_time = sum(r['processing_time'] for r in parsed_results)
     
     # Final summary
     print(f"\n{'=' * 80}")
@@ -203,7 +283,7 @@ def create_test_runner():
     print(f"✅ Successful tests: {successful_tests}")
     print(f"❌ Failed tests: {failed_tests}")
     print(f"📊 Success rate: {(successful_tests / len(test_files) * 100):.1f}%")
-    print(f"⏱️  Total processing time: {total_processing_time:.3f}s")
+    print(f"⏱️  Total processing time: {total_processing_time:.3f}s ({len(parsed_results)} parsed, {successful_tests - len(parsed_results)} cached)")
     print(f"📋 Total transactions processed: {total_transactions}")
     print(f"📄 Total claims processed: {total_claims}")
     print(f"🔧 Total services processed: {total_services}")
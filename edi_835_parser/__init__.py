@@ -1,14 +1,20 @@
 import os
-import tempfile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from warnings import warn
 
 from edi_835_parser.transaction_set.transaction_set import TransactionSet
 from edi_835_parser.transaction_set.transaction_sets import TransactionSets
+from edi_835_parser.segments.utilities import SPECIAL_SEPARATORS
 
 # Export the main functions
 __all__ = ['parse', 'parse_to_json', 'preprocess_edi_content']
 
+# File extensions picked up when parsing a directory
+_EDI_835_SUFFIXES = ('.txt', '.835', '.DAT')
+
+# Character replacements applied by preprocess_edi_content, newlines are removed
+_PREPROCESS_TRANSLATION = str.maketrans({**SPECIAL_SEPARATORS, '\n': None})
+
 
 def preprocess_edi_content(content: str) -> str:
 	"""
@@ -26,15 +32,8 @@ def preprocess_edi_content(content: str) -> str:
 	Returns:
 		str: Processed EDI content with replaced separators
 	"""
-	processed_content = content
-	
-	# Apply character replacements as requested by user
-	processed_content = processed_content.replace('\x1d', '*')  # Element separator
-	processed_content = processed_content.replace('\x1e', '~')  # Component separator
-	processed_content = processed_content.replace('\n', '')     # Remove newlines
-	processed_content = processed_content.replace('\x1f', ':')  # Segment terminator (user request)
-	
-	return processed_content
+	# Apply all character replacements in a single pass
+	return content.translate(_PREPROCESS_TRANSLATION)
 
 
 def parse(path: str, debug: bool = False, preprocess: bool = True) -> TransactionSets:
@@ -56,7 +55,7 @@ def parse(path: str, debug: bool = False, preprocess: bool = True) -> Transactio
 	if os.path.isdir(path):
 		files = _find_edi_835_files(path)
 		for file in files:
-			file_path = f'{path}/{file}'
+			file_path = os.path.join(path, file)
 			if debug:
 				transaction_set = _build_transaction_set(file_path, preprocess)
 				transaction_sets.append(transaction_set)
@@ -73,7 +72,12 @@ def parse(path: str, debug: bool = False, preprocess: bool = True) -> Transactio
 	return TransactionSets(transaction_sets)
 
 
-def parse_to_json(path: str, debug: bool = False, preprocess: bool = True) -> Dict[str, Any]:
+def parse_to_json(
+		path: str,
+		debug: bool = False,
+		preprocess: bool = True,
+		subset: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
 	"""
 	Parse EDI 835 file(s) and return JSON structured data.
 	
@@ -81,6 +85,7 @@ def parse_to_json(path: str, debug: bool = False, preprocess: bool = True) -> Di
 		path (str): Path to EDI file or directory
 		debug (bool): Enable debug mode
 		preprocess (bool): Automatically preprocess files with special characters
+		subset (Iterable[str], optional): Only convert these segment identifiers, see TransactionSet.to_json
 	
 	Returns:
 		Dict[str, Any]: JSON structured data
@@ -94,28 +99,19 @@ def parse_to_json(path: str, debug: bool = False, preprocess: bool = True) -> Di
 		if not files:
 			raise ValueError(f"No EDI 835 files found in directory: {path}")
 		# Use the first file found
-		file_path = f'{path}/{files[0]}'
+		file_path = os.path.join(path, files[0])
 	else:
 		file_path = path
 
+	# the JSON is streamed from the file in one pass, the loops build makes for to_dataframe aren't needed
 	if debug:
-		transaction_set = _build_transaction_set(file_path, preprocess)
-		return transaction_set.to_json()
+		return TransactionSet.file_to_json(file_path, preprocess, subset)
 	else:
 		try:
-			transaction_set = _build_transaction_set(file_path, preprocess)
-			return transaction_set.to_json()
+			return TransactionSet.file_to_json(file_path, preprocess, subset)
 		except Exception as e:
-			warn(f'Failed to build a transaction set from {file_path} with error: {e}')
+			warn(f'Failed to convert {file_path} to JSON with error: {e}')
 			raise
-		# If we reach here, it means the transaction set was built successfully
-		# delete temporary file if it was created
-		finally:
-			if hasattr(transaction_set, 'file_path') and transaction_set.file_path.endswith('.processed.tmp'):
-				temp_file_path = transaction_set.file_path
-				if os.path.exists(temp_file_path):
-					os.unlink(temp_file_path)
-					print(f"Temporary file deleted: {temp_file_path}")
 
 
 def _build_transaction_set(file_path: str, preprocess: bool = True) -> TransactionSet:
@@ -129,49 +125,13 @@ def _build_transaction_set(file_path: str, preprocess: bool = True) -> Transacti
 	Returns:
 		TransactionSet: Built transaction set
 	"""
-	if not preprocess:
-		return TransactionSet.build(file_path)
-	
-	# Check if file needs preprocessing by looking for special characters
-	with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-		content = f.read()
-	
-	# Check for special characters that need preprocessing
-	needs_preprocessing = any(char in content for char in ['\x1d', '\x1e', '\x1f'])
-	
-	if needs_preprocessing:
-		# Preprocess the content
-		processed_content = preprocess_edi_content(content)
-		
-		# Create a temporary file with processed content that won't be auto-deleted
-		temp_file_path = file_path + '.processed.tmp'
-		
-		with open(temp_file_path, 'w', encoding='utf-8') as temp_file:
-			temp_file.write(processed_content)
-		
-		try:
-			# Build transaction set from processed file
-			transaction_set = TransactionSet.build(temp_file_path)
-			# Update the file_path in the transaction set to the original path for reference
-			transaction_set.file_path = temp_file_path
-			return transaction_set
-		finally:
-			# Clean up temporary file
-			#if os.path.exists(temp_file_path):
-			#	os.unlink(temp_file_path)
-			print(f"Temporary file retained for debugging: {temp_file_path}")
-	else:
-		# No preprocessing needed
-		return TransactionSet.build(file_path)
-
+	# the file is streamed rather than read whole, preprocessing is applied as it is read
+	return TransactionSet.build(file_path, preprocess)
 
-def _find_edi_835_files(path: str) -> List[str]	:
-	files = []
-	for file in os.listdir(path):
-		if file.endswith('.txt') or file.endswith('.835') or file.endswith('.DAT'):
-			files.append(file)
 
-	return files
+def _find_edi_835_files(path: str) -> List[str]:
+	with os.scandir(path) as entries:
+		return [entry.name for entry in entries if entry.name.endswith(_EDI_835_SUFFIXES) and entry.is_file()]
 
 
 def main():
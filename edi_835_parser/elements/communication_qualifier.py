@@ -12,5 +12,5 @@ communication_qualifiers = {
 
 class CommunicationQualifier(Element):
 
-	def parser(self, value: str) -> str:
-		return communication_qualifiers.get(value, value)
\ No newline at end of file
+	def parser(self, value: str, _get=communication_qualifiers.get) -> str:
+		return _get(value, value)
\ No newline at end of file
@@ -11,5 +11,5 @@ contact_function_codes = {
 
 class ContactFunctionCode(Element):
 
-	def parser(self, value: str) -> str:
-		return contact_function_codes.get(value, value)
\ No newline at end of file
+	def parser(self, value: str, _get=contact_function_codes.get) -> str:
+		return _get(value, value)
\ No newline at end of file
@@ -6,18 +6,21 @@ from edi_835_parser.segments.utilities import split_segment
 class AssignedNumber:
 	identification = 'LX'
 
+	# element descriptors store their parsed values under the underscored names
+	__slots__ = ('segment', '_identifier', '_assigned_number')
+
 	identifier = Identifier()
 	assigned_number = Integer()
 
 	def __init__(self, segment: str):
 		self.segment = segment
 		segment = split_segment(segment)
+		segment += [None] * (2 - len(segment))
 
-		self.identifier = segment[0]
-		self.assigned_number = segment[1]
+		self.identifier, self.assigned_number = segment[:2]
 
 	def __repr__(self) -> str:
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		return '\n'.join(str((name, getattr(self, name))) for name in self.__slots__)
 
 	def __str__(self) -> str:
 		return f'Assigned Number: {self.assigned_number}'
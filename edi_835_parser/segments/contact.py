@@ -1,12 +1,24 @@
 from edi_835_parser.elements.identifier import Identifier
 from edi_835_parser.elements.contact_function_code import ContactFunctionCode
 from edi_835_parser.elements.communication_qualifier import CommunicationQualifier
-from edi_835_parser.segments.utilities import split_segment, get_element
+from edi_835_parser.segments.utilities import split_segment
 
 
 class Contact:
 	identification = 'PER'
 
+	# element descriptors store their parsed values under the underscored names
+	__slots__ = (
+		'segment',
+		'_identifier',
+		'_contact_function_code',
+		'name',
+		'_communication_number_qualifier',
+		'communication_number',
+		'_communication_number_qualifier_2',
+		'communication_number_2',
+	)
+
 	identifier = Identifier()
 	contact_function_code = ContactFunctionCode()
 	communication_number_qualifier = CommunicationQualifier()
@@ -15,17 +27,21 @@ class Contact:
 	def __init__(self, segment: str):
 		self.segment = segment
 		segment = split_segment(segment)
-
-		self.identifier = segment[0]
-		self.contact_function_code = segment[1]
-		self.name = get_element(segment, 2) if get_element(segment, 2) != '' else None
-		self.communication_number_qualifier = get_element(segment, 3)
-		self.communication_number = get_element(segment, 4)
-		self.communication_number_qualifier_2 = get_element(segment, 5)
-		self.communication_number_2 = get_element(segment, 6)
+		segment += [None] * (7 - len(segment))
+
+		(
+			self.identifier,
+			self.contact_function_code,
+			self.name,
+			self.communication_number_qualifier,
+			self.communication_number,
+			self.communication_number_qualifier_2,
+			self.communication_number_2,
+		) = segment[:7]
+		self.name = self.name or None
 
 	def __repr__(self) -> str:
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		return '\n'.join(str((name, getattr(self, name))) for name in self.__slots__)
 
 	def __str__(self) -> str:
 		return f'Contact {self.contact_function_code}: {self.name or "N/A"}'
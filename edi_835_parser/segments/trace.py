@@ -5,19 +5,20 @@ from edi_835_parser.segments.utilities import split_segment
 class Trace:
 	identification = 'TRN'
 
+	# element descriptors store their parsed values under the underscored names
+	__slots__ = ('segment', '_identifier', 'trace_type', 'trace_number', 'entity_identifier')
+
 	identifier = Identifier()
 
 	def __init__(self, segment: str):
 		self.segment = segment
 		segment = split_segment(segment)
+		segment += [None] * (4 - len(segment))
 
-		self.identifier = segment[0]
-		self.trace_type = segment[1]
-		self.trace_number = segment[2]
-		self.entity_identifier = segment[3] if len(segment) > 3 else None
+		self.identifier, self.trace_type, self.trace_number, self.entity_identifier = segment[:4]
 
 	def __repr__(self) -> str:
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		return '\n'.join(str((name, getattr(self, name))) for name in self.__slots__)
 
 	def __str__(self) -> str:
 		return f'Trace {self.trace_type}: {self.trace_number}'
@@ -1,23 +1,104 @@
-from typing import List, Optional
+import codecs
+import logging
+import re
+import sys
+from functools import partial
+from itertools import chain
+from typing import List, Optional, Iterable, Iterator, Union, TextIO
 
+logger = logging.getLogger(__name__)
 
-def split_segment(segment: str) -> List[str]:
+CHUNK_SIZE = 65536
+
+# control character separators some payers use, and the standard separators they are preprocessed into
+SPECIAL_SEPARATORS = {
+	'\x1d': '*',  # Element separator
+	'\x1e': '~',  # Component separator
+	'\x1f': ':',  # Segment terminator (user request)
+}
+
+# content containing any of the special separators needs preprocessing
+SPECIAL_CHARACTERS = re.compile('[' + ''.join(SPECIAL_SEPARATORS) + ']')
+
+# byte level equivalents, used when preprocessing a file as it is read
+_SPECIAL_BYTES = re.compile(SPECIAL_CHARACTERS.pattern.encode('ascii'))
+_PREPROCESS_TABLE = bytes.maketrans(
+	''.join(SPECIAL_SEPARATORS).encode('ascii'),
+	''.join(SPECIAL_SEPARATORS.values()).encode('ascii'),
+)
+
+# files using the control characters as separators show them in the ISA header near the start
+SPECIAL_CHARACTERS_PEEK = 4096
+
+
+def element_delimiter(segment: str) -> str:
 	"""different payers use different characters to delineate elements"""
 	asterisk = '*'
 	pipe = '|'
 
-	asterisk_segment_count = len(segment.split(asterisk))
-	pipe_segment_count = len(segment.split(pipe))
+	# counting delimiters picks the same one as comparing split lengths, without building throwaway lists
+	if segment.count(asterisk) > segment.count(pipe):
+		return asterisk
+	else:
+		return pipe
+
+
+def split_segment(segment: str) -> List[str]:
+	"""split a segment into its elements"""
+	elements = segment.split(element_delimiter(segment))
 
-	if asterisk_segment_count > pipe_segment_count:
-		return segment.split(asterisk)
+	# intern the segment identifier so repeated identifiers share a single string object
+	elements[0] = sys.intern(elements[0])
+	return elements
+
+
+def iter_chunks(source: Union[str, TextIO], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+	"""yield EDI content in fixed size pieces, from either a string or an open text file"""
+	if isinstance(source, str):
+		for start in range(0, len(source), chunk_size):
+			yield source[start:start + chunk_size]
 	else:
-		return segment.split(pipe)
+		yield from iter(partial(source.read, chunk_size), '')
+
+
+def iter_segments(chunks: Iterable[str], terminator: str = '~') -> Iterator[str]:
+	"""lazily yield the same stripped segments as [s.strip() for s in ''.join(chunks).split(terminator)]"""
+	pending = []
+	for chunk in chunks:
+		pieces = chunk.split(terminator)
+		if len(pieces) == 1:
+			pending.append(chunk)
+			continue
+
+		pending.append(pieces[0])
+		yield ''.join(pending).strip()
+		for piece in pieces[1:-1]:
+			yield piece.strip()
+		pending = [pieces[-1]]
+
+	yield ''.join(pending).strip()
+
+
+def iter_file_segments(file_path: str) -> Iterator[str]:
+	"""stream the segments of an EDI file, a file using the control character separators
+	is preprocessed chunk by chunk as it is read, with its line breaks removed"""
+	with open(file_path, 'rb') as f:
+		chunks = iter(partial(f.read, CHUNK_SIZE), b'')
+		first_chunk = next(chunks, b'')
+		chunks = chain((first_chunk,), chunks)
+
+		if _SPECIAL_BYTES.search(first_chunk, 0, SPECIAL_CHARACTERS_PEEK) is not None:
+			logger.debug('Preprocessing control character separators in %s', file_path)
+			chunks = (chunk.translate(_PREPROCESS_TABLE, b'\r\n') for chunk in chunks)
+
+		# the incremental decoder keeps multi-byte characters split across chunks intact
+		yield from iter_segments(codecs.iterdecode(chunks, 'utf-8', errors='replace'))
 
 
 def find_identifier(segment) -> str:
-	segment = split_segment(segment)
-	return segment[0]
+	# only the first element is needed, so split off just that instead of every element;
+	# the delimiter is picked the same way split_segment picks it so both agree on the identifier
+	return segment.partition(element_delimiter(segment))[0]
 
 def get_element(segment: List[str], index: int, default=None) -> Optional[str]:
 	element = default
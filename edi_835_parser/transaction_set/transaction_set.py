@@ -1,18 +1,481 @@
-from typing import List, Iterator, Optional, Dict, Any
-from collections import namedtuple
+from typing import List, Iterator, Iterable, Optional, Dict, Any, BinaryIO, Callable, Tuple, FrozenSet
+from functools import lru_cache
+from operator import attrgetter
+from itertools import chain
+import io
 import json
 
 import pandas as pd
 
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	# codes and names take far less memory as Arrow backed strings than as Python objects
+	_ARROW_STRING_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+	_ARROW_STRING_DTYPE = None
+
 from edi_835_parser.loops.claim import Claim as ClaimLoop
 from edi_835_parser.loops.service import Service as ServiceLoop
 from edi_835_parser.loops.organization import Organization as OrganizationLoop
-from edi_835_parser.segments.utilities import find_identifier, split_segment
+from edi_835_parser.segments.utilities import (
+	element_delimiter, find_identifier, iter_chunks, iter_segments, iter_file_segments, SPECIAL_CHARACTERS,
+)
 from edi_835_parser.segments.interchange import Interchange as InterchangeSegment
 from edi_835_parser.segments.financial_information import FinancialInformation as FinancialInformationSegment
 from edi_835_parser.segments.trace import Trace as TraceSegment
 
-BuildAttributeResponse = namedtuple('BuildAttributeResponse', 'key value segment segments')
+
+# to_dataframe columns holding codes and names, the adj_/ref_/rem_ code and value columns are added per call
+_STRING_COLUMNS = (
+	'marker', 'patient', 'code', 'modifier', 'qualifier', 'icn', 'payer', 'rendering_provider', 'payer_classification',
+)
+
+
+def _dumps(obj: Any) -> bytes:
+	"""compact UTF-8 JSON encoding, using orjson when it is installed"""
+	if orjson is not None:
+		return orjson.dumps(obj)
+	return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# JSON field names of each segment's elements, in element order after the identifier
+_ISA_FIELDS = (
+	"authorization_information_qualifier",
+	"authorization_information",
+	"security_information_qualifier",
+	"security_information",
+	"interchange_sender_id_qualifier",
+	"interchange_sender_id",
+	"interchange_receiver_id_qualifier",
+	"interchange_receiver_id",
+	"interchange_date",
+	"interchange_time",
+	"interchange_control_standards_identifier",
+	"interchange_control_version_number",
+	"interchange_control_number",
+	"acknowledgement_requested",
+	"usage_indicator",
+	"component_element_separator",
+)
+
+_GS_FIELDS = (
+	"functional_identifier_code",
+	"application_sender_code",
+	"application_receiver_id",
+	"date",
+	"time",
+	"group_control_number",
+	"responsible_agency_code",
+	"version_release_industry_identifier",
+)
+
+_ST_FIELDS = (
+	"transaction_set_identifier_code",
+	"transaction_set_control_number",
+)
+
+_BPR_FIELDS = (
+	"transaction_handling_code",
+	"monetary_amount",
+	"credit_debit_flag",
+	"payment_method_code",
+	"payment_format_code",
+	"dfi_id_number_qualifier",
+	"dfi_identification_number",
+	"account_number_qualifier",
+	"sender_bank_account_number",
+	"originating_company_identifier",
+	"originating_company_supplemental_code",
+	"dfi_identification_number_qualifier",
+	"receiver_or_provider_bank_id_number",
+	"account_number_qualifier_2",
+	"receiver_or_provider_account_number",
+	"check_issue_or_eft_effective_date",
+)
+
+_TRN_FIELDS = (
+	"trace_type_code",
+	"reference_identification",
+	"originating_company_identifier",
+	"originating_company_supplemental_code",
+)
+
+_DTM_FIELDS = (
+	"date_time_qualifier",
+	"date",
+	"time",
+	"time_code",
+	"date_time_period_format",
+	"date_time_period",
+)
+
+_N1_FIELDS = (
+	"entity_identifier_code",
+	"name",
+	"identification_code_qualifier",
+	"identification_code",
+)
+
+_N3_FIELDS = (
+	"address_line_1",
+	"address_line_2",
+)
+
+_N4_FIELDS = (
+	"city_name",
+	"state_code",
+	"postal_code",
+	"country_code",
+	"location_qualifier",
+	"location_identifier",
+)
+
+_PER_FIELDS = (
+	"contact_function_code",
+	"contact_name",
+	"communication_number_qualifier_1",
+	"communication_number_1",
+	"communication_number_qualifier_2",
+	"communication_number_2",
+	"communication_number_qualifier_3",
+	"communication_number_3",
+	"contact_inquiry_reference",
+)
+
+_REF_FIELDS = (
+	"reference_identification_qualifier",
+	"reference_identification",
+	"description",
+	"reference_identifier",
+)
+
+_CLP_FIELDS = (
+	"patient_control_number",
+	"claim_status_code",
+	"total_claim_charge_amount",
+	"total_claim_payment_amount",
+	"patient_responsibility_amount",
+	"claim_filing_indicator_code",
+	"payer_claim_control_number",
+	"facility_type_code",
+	"claim_frequency_code",
+	"patient_status_code",
+	"diagnosis_related_group_code",
+	"drg_weight",
+	"discharge_fraction",
+)
+
+_CAS_FIELDS = (
+	"claim_adjustment_group_code",
+	"adjustment_reason_code",
+	"adjustment_amount",
+	"adjustment_quantity",
+	"adjustment_reason_code_2",
+	"adjustment_amount_2",
+	"adjustment_quantity_2",
+	"adjustment_reason_code_3",
+	"adjustment_amount_3",
+	"adjustment_quantity_3",
+	"adjustment_reason_code_4",
+	"adjustment_amount_4",
+	"adjustment_quantity_4",
+	"adjustment_reason_code_5",
+	"adjustment_amount_5",
+	"adjustment_quantity_5",
+	"adjustment_reason_code_6",
+	"adjustment_amount_6",
+	"adjustment_quantity_6",
+)
+
+_NM1_FIELDS = (
+	"entity_identifier_code",
+	"entity_type_qualifier",
+	"last_name",
+	"first_name",
+	"middle_name",
+	"name_prefix",
+	"name_suffix",
+	"identification_code_qualifier",
+	"identification_code",
+	"entity_relationship_code",
+	"entity_identifier_code_2",
+	"identification_code_qualifier_2",
+)
+
+_AMT_FIELDS = (
+	"amount_qualifier_code",
+	"monetary_amount",
+	"credit_debit_flag_code",
+)
+
+_SVC_FIELDS = (
+	"service_type_code",
+	"charge_amount",
+	"payment_amount",
+	"revenue_code",
+	"units_of_service_paid",
+	"original_units_of_service",
+	"adjudicated_date",
+)
+
+_PLB_FIELDS = (
+	"provider_identifier",
+	"fiscal_period_date",
+	"provider_adjustment_identifier",
+	"provider_adjustment_amount",
+	"provider_adjustment_identifier_2",
+	"provider_adjustment_amount_2",
+)
+
+_SE_FIELDS = (
+	"number_of_included_segments",
+	"transaction_set_control_number",
+)
+
+_GE_FIELDS = (
+	"number_of_transaction_sets_included",
+	"group_control_number",
+)
+
+_IEA_FIELDS = (
+	"number_of_included_functional_groups",
+	"interchange_control_number",
+)
+
+
+def _make_converter(fields: Tuple[str, ...]) -> Callable[[List[str]], Dict[str, str]]:
+	"""converter for one segment type, mapping its elements onto the field names;
+	missing trailing elements become empty strings and extra elements are dropped by zip"""
+	count = len(fields)
+	padding = ("",) * count
+
+	def convert(values: List[str]) -> Dict[str, str]:
+		if len(values) < count:
+			values += padding[:count - len(values)]
+		return dict(zip(fields, values))
+
+	return convert
+
+
+class _JsonState:
+	"""the loops to_json is currently filling in, segments are placed into the innermost open loop"""
+	__slots__ = ('interchange', 'transaction', 'n1_loop', 'clp_loop', 'svc_loop')
+
+	def __init__(self, interchange: Dict[str, Any]):
+		self.interchange = interchange
+		self.transaction = None
+		self.n1_loop = None
+		self.clp_loop = None
+		self.svc_loop = None
+
+
+def _set_on_interchange(key: str) -> Callable[[_JsonState, Any], None]:
+	def place(state: _JsonState, data: Any) -> None:
+		state.interchange[key] = data
+	return place
+
+
+def _set_on_transaction(key: str) -> Callable[[_JsonState, Any], None]:
+	def place(state: _JsonState, data: Any) -> None:
+		if state.transaction is not None:
+			state.transaction[key] = data
+	return place
+
+
+def _append_to_transaction(key: str) -> Callable[[_JsonState, Any], None]:
+	def place(state: _JsonState, data: Any) -> None:
+		if state.transaction is not None:
+			state.transaction[key].append(data)
+	return place
+
+
+def _set_on_n1_loop(key: str) -> Callable[[_JsonState, Any], None]:
+	def place(state: _JsonState, data: Any) -> None:
+		if state.n1_loop is not None:
+			state.n1_loop[key] = data
+	return place
+
+
+def _append_to_clp_loop(key: str) -> Callable[[_JsonState, Any], None]:
+	def place(state: _JsonState, data: Any) -> None:
+		if state.clp_loop is not None:
+			state.clp_loop[key].append(data)
+	return place
+
+
+def _append_to_innermost_loop(key: str, transaction_level: bool = False) -> Callable[[_JsonState, Any], None]:
+	"""service loop if one is open, otherwise the claim loop, otherwise (optionally) the transaction"""
+	def place(state: _JsonState, data: Any) -> None:
+		if state.svc_loop is not None:
+			state.svc_loop[key].append(data)
+		elif state.clp_loop is not None:
+			state.clp_loop[key].append(data)
+		elif transaction_level and state.transaction is not None:
+			state.transaction[key].append(data)
+	return place
+
+
+def _close_svc_loop(state: _JsonState) -> None:
+	"""drop the collections the open service loop never used, a service only lists the segments it has"""
+	svc_loop = state.svc_loop
+	if svc_loop is not None:
+		for key in ("DTM", "CAS", "REF", "AMT"):
+			if not svc_loop[key]:
+				del svc_loop[key]
+		state.svc_loop = None
+
+
+def _start_transaction(state: _JsonState, data: Any) -> None:
+	state.transaction = {
+		"ST": data,
+		"BPR": None,
+		"TRN": None,
+		"DTM": [],
+		"N1_loop": [],
+		"CLP_loop": [],
+		"PLB": [],
+		"SE": None
+	}
+	state.interchange["transactions"].append(state.transaction)
+
+
+def _start_n1_loop(state: _JsonState, data: Any) -> None:
+	if state.transaction is not None:
+		state.n1_loop = {
+			"N1": data,
+			"N3": None,
+			"N4": None,
+			"PER": None
+		}
+		state.transaction["N1_loop"].append(state.n1_loop)
+
+
+def _start_clp_loop(state: _JsonState, data: Any) -> None:
+	if state.transaction is not None:
+		state.clp_loop = {
+			"CLP": data,
+			"CAS": [],
+			"NM1": [],
+			"DTM": [],
+			"AMT": [],
+			"REF": [],
+			"SVC_loop": []
+		}
+		state.transaction["CLP_loop"].append(state.clp_loop)
+		_close_svc_loop(state)
+
+
+def _start_svc_loop(state: _JsonState, data: Any) -> None:
+	if state.clp_loop is not None:
+		_close_svc_loop(state)
+		state.svc_loop = {
+			"SVC": data,
+			"DTM": [],
+			"CAS": [],
+			"REF": [],
+			"AMT": []
+		}
+		state.clp_loop["SVC_loop"].append(state.svc_loop)
+
+
+def _end_transaction(state: _JsonState, data: Any) -> None:
+	if state.transaction is not None:
+		state.transaction["SE"] = data
+		state.transaction = None
+		state.n1_loop = None
+		state.clp_loop = None
+		_close_svc_loop(state)
+
+
+# segment identifier -> (converter, placer) used by to_json,
+# LX (claim grouping) and unknown segments have no entry and are skipped
+_JSON_DISPATCH: Dict[str, Tuple[Callable[[List[str]], Dict[str, str]], Callable[[_JsonState, Any], None]]] = {
+	"ISA": (_make_converter(_ISA_FIELDS), _set_on_interchange("ISA")),
+	"GS": (_make_converter(_GS_FIELDS), _set_on_interchange("GS")),
+	"ST": (_make_converter(_ST_FIELDS), _start_transaction),
+	"BPR": (_make_converter(_BPR_FIELDS), _set_on_transaction("BPR")),
+	"TRN": (_make_converter(_TRN_FIELDS), _set_on_transaction("TRN")),
+	"DTM": (_make_converter(_DTM_FIELDS), _append_to_innermost_loop("DTM", transaction_level=True)),
+	"N1": (_make_converter(_N1_FIELDS), _start_n1_loop),
+	"N3": (_make_converter(_N3_FIELDS), _set_on_n1_loop("N3")),
+	"N4": (_make_converter(_N4_FIELDS), _set_on_n1_loop("N4")),
+	"PER": (_make_converter(_PER_FIELDS), _set_on_n1_loop("PER")),
+	"REF": (_make_converter(_REF_FIELDS), _append_to_innermost_loop("REF")),
+	"CLP": (_make_converter(_CLP_FIELDS), _start_clp_loop),
+	"CAS": (_make_converter(_CAS_FIELDS), _append_to_innermost_loop("CAS")),
+	"NM1": (_make_converter(_NM1_FIELDS), _append_to_clp_loop("NM1")),
+	"AMT": (_make_converter(_AMT_FIELDS), _append_to_innermost_loop("AMT")),
+	"SVC": (_make_converter(_SVC_FIELDS), _start_svc_loop),
+	"PLB": (_make_converter(_PLB_FIELDS), _append_to_transaction("PLB")),
+	"SE": (_make_converter(_SE_FIELDS), _end_transaction),
+	"GE": (_make_converter(_GE_FIELDS), _set_on_interchange("GE")),
+	"IEA": (_make_converter(_IEA_FIELDS), _set_on_interchange("IEA")),
+}
+
+
+# segments that open or close a to_json loop, they are still walked when left out of a subset
+# so the segments that were asked for nest the same way, only their own values are left empty
+_STRUCTURAL_IDENTIFIERS = frozenset(('ST', 'N1', 'CLP', 'SVC', 'SE'))
+
+
+def _skip_conversion(values: List[str]) -> None:
+	return None
+
+
+@lru_cache(maxsize=32)
+def _subset_dispatch(subset: FrozenSet[str]) -> Dict[str, Tuple[Callable[[List[str]], Any], Callable[[_JsonState, Any], None]]]:
+	"""the to_json dispatch table limited to the segment identifiers in subset"""
+	dispatch = {}
+	for identifier, (convert, place) in _JSON_DISPATCH.items():
+		if identifier in subset:
+			dispatch[identifier] = (convert, place)
+		elif identifier in _STRUCTURAL_IDENTIFIERS:
+			dispatch[identifier] = (_skip_conversion, place)
+	return dispatch
+
+
+def _new_interchange() -> Dict[str, Any]:
+	return {
+		"ISA": None,
+		"GS": None,
+		"transactions": [],
+		"GE": None,
+		"IEA": None
+	}
+
+
+def _place_segments(
+		segments: Iterable[str],
+		state: _JsonState,
+		subset: Optional[Iterable[str]] = None,
+) -> Iterator[None]:
+	"""convert and place each segment into the to_json structure, pausing after every SE segment
+	since the transactions placed so far can no longer change"""
+	if isinstance(subset, str):
+		# a single identifier, not the characters of one
+		subset = (subset,)
+	dispatch = _JSON_DISPATCH if subset is None else _subset_dispatch(frozenset(subset))
+
+	# split_segment is inlined here, this loop runs once per segment of every file converted;
+	# only the elements after the identifier are split since the identifier is not kept,
+	# the delimiter comes from the same element_delimiter rule split_segment uses
+	for segment in segments:
+		if not segment:
+			continue
+		delimiter = element_delimiter(segment)
+		identifier, _, elements = segment.partition(delimiter)
+		handler = dispatch.get(identifier)
+		if handler is not None:
+			convert, place = handler
+			place(state, convert(elements.split(delimiter)))
+			if place is _end_transaction:
+				yield
+
+	_close_svc_loop(state)
 
 
 class TransactionSet:
@@ -24,7 +487,9 @@ class TransactionSet:
 			trace: TraceSegment,
 			claims: List[ClaimLoop],
 			organizations: List[OrganizationLoop],
-			file_path: str,
+			file_path: Optional[str],
+			content: Optional[str] = None,
+			preprocess: bool = False,
 	):
 		self.interchange = interchange
 		self.financial_information = financial_information
@@ -33,50 +498,177 @@ class TransactionSet:
 		self.organizations = organizations
 		self.file_path = file_path
 
+		# payer and payee look organizations up by type here rather than rescanning the list on every access,
+		# the index is built once so organizations added to or removed from the list later aren't reflected
+		self._organizations_by_type: Dict[str, List[OrganizationLoop]] = {}
+		for organization in organizations:
+			self._organizations_by_type.setdefault(organization.organization.type, []).append(organization)
+
+		# where to_json reads the segments from again, the content a set was built from in memory
+		# or else the file, streamed with the same preprocessing build used
+		self.content = content
+		self.preprocess = preprocess
+
 	def __repr__(self):
-		return '\n'.join(str(item) for item in self.__dict__.items())
+		# kept constant size so logging a transaction set stays cheap, describe() has the full detail
+		return (
+			f'<TransactionSet claims={len(self.claims)} organizations={len(self.organizations)} '
+			f'file_path={self.file_path!r}>'
+		)
+
+	def describe(self) -> str:
+		"""every parsed attribute of the transaction set, one per line"""
+		attributes = ('interchange', 'financial_information', 'trace', 'claims', 'organizations', 'file_path')
+		return '\n'.join(str((name, getattr(self, name))) for name in attributes)
 
 	@property
 	def payer(self) -> OrganizationLoop:
-		payer = [o for o in self.organizations if o.organization.type == 'payer']
+		payer = self._organizations_by_type.get('payer', [])
 		assert len(payer) == 1
 		return payer[0]
 
 	@property
 	def payee(self) -> OrganizationLoop:
-		payee = [o for o in self.organizations if o.organization.type == 'payee']
+		payee = self._organizations_by_type.get('payee', [])
 		assert len(payee) == 1
 		return payee[0]
 
-	def to_dataframe(self) -> pd.DataFrame:
-		"""flatten the remittance advice by service to a pandas DataFrame"""
-		data = []
-		for claim in self.claims:
-			for service in claim.services:
-
-				datum = TransactionSet.serialize_service(
-					self.financial_information,
-					self.payer,
-					claim,
-					service
-				)
-
-				for index, adjustment in enumerate(service.adjustments):
-					datum[f'adj_{index}_group'] = adjustment.group_code.code
-					datum[f'adj_{index}_code'] = adjustment.reason_code.code
-					datum[f'adj_{index}_amount'] = adjustment.amount
-
-				for index, reference in enumerate(service.references):
-					datum[f'ref_{index}_qual'] = reference.qualifier.code
-					datum[f'ref_{index}_value'] = reference.value
-
-				for index, remark in enumerate(service.remarks):
-					datum[f'rem_{index}_qual'] = remark.qualifier.code
-					datum[f'rem_{index}_code'] = remark.code.code
-
-				data.append(datum)
-
-		return pd.DataFrame(data)
+	def to_dataframe(self, repeated_columns: bool = True) -> pd.DataFrame:
+		"""flatten the remittance advice by service to a pandas DataFrame,
+		without repeated_columns the adj_/ref_/rem_ columns are left out in favour of
+		adjustments_to_dataframe, references_to_dataframe and remarks_to_dataframe"""
+		services = self._claim_services()
+		if not services:
+			return pd.DataFrame()
+
+		# lay the repeated columns out in the order services first use them,
+		# a service only introduces the indexes beyond the largest seen so far
+		repeated_names = []
+		max_adjustments = max_references = max_remarks = 0
+		if repeated_columns:
+			for _, service in services:
+				adjustment_count = len(service.adjustments)
+				reference_count = len(service.references)
+				remark_count = len(service.remarks)
+
+				for index in range(max_adjustments, adjustment_count):
+					repeated_names += [f'adj_{index}_group', f'adj_{index}_code', f'adj_{index}_amount']
+				for index in range(max_references, reference_count):
+					repeated_names += [f'ref_{index}_qual', f'ref_{index}_value']
+				for index in range(max_remarks, remark_count):
+					repeated_names += [f'rem_{index}_qual', f'rem_{index}_code']
+
+				max_adjustments = max(max_adjustments, adjustment_count)
+				max_references = max(max_references, reference_count)
+				max_remarks = max(max_remarks, remark_count)
+
+		repeated = {name: [] for name in repeated_names}
+		adjustment_columns = [
+			(repeated[f'adj_{index}_group'], repeated[f'adj_{index}_code'], repeated[f'adj_{index}_amount'])
+			for index in range(max_adjustments)
+		]
+		reference_columns = [
+			(repeated[f'ref_{index}_qual'], repeated[f'ref_{index}_value'])
+			for index in range(max_references)
+		]
+		remark_columns = [
+			(repeated[f'rem_{index}_qual'], repeated[f'rem_{index}_code'])
+			for index in range(max_remarks)
+		]
+
+		# resolve the payer and its assertion once rather than per service
+		financial_information = self.financial_information
+		payer = self.payer
+		columns = {}
+		for claim, service in services:
+			datum = TransactionSet.serialize_service(
+				financial_information,
+				payer,
+				claim,
+				service
+			)
+			for name, value in datum.items():
+				columns.setdefault(name, []).append(value)
+
+			adjustments = service.adjustments
+			for index, (group, code, amount) in enumerate(adjustment_columns):
+				if index < len(adjustments):
+					adjustment = adjustments[index]
+					group.append(adjustment.group_code.code)
+					code.append(adjustment.reason_code.code)
+					amount.append(adjustment.amount)
+				else:
+					group.append(None)
+					code.append(None)
+					amount.append(None)
+
+			references = service.references
+			for index, (qualifier, value) in enumerate(reference_columns):
+				if index < len(references):
+					qualifier.append(references[index].qualifier.code)
+					value.append(references[index].value)
+				else:
+					qualifier.append(None)
+					value.append(None)
+
+			remarks = service.remarks
+			for index, (qualifier, code) in enumerate(remark_columns):
+				if index < len(remarks):
+					qualifier.append(remarks[index].qualifier.code)
+					code.append(remarks[index].code.code)
+				else:
+					qualifier.append(None)
+					code.append(None)
+
+		columns.update(repeated)
+		data = pd.DataFrame(columns, copy=False)
+
+		if _ARROW_STRING_DTYPE is not None:
+			# pandas versions that infer strings as object columns still get the Arrow backed strings
+			string_columns = [name for name in (*_STRING_COLUMNS, *repeated_names) if not name.endswith('_amount')]
+			data = data.astype({name: _ARROW_STRING_DTYPE for name in string_columns if data[name].dtype == object})
+
+		return data
+
+	def adjustments_to_dataframe(self) -> pd.DataFrame:
+		"""the service adjustments in long format, one row per adjustment"""
+		return self._repeated_to_dataframe('adjustments', {
+			'group': attrgetter('group_code.code'),
+			'code': attrgetter('reason_code.code'),
+			'amount': attrgetter('amount'),
+		})
+
+	def references_to_dataframe(self) -> pd.DataFrame:
+		"""the service references in long format, one row per reference"""
+		return self._repeated_to_dataframe('references', {
+			'qual': attrgetter('qualifier.code'),
+			'value': attrgetter('value'),
+		})
+
+	def remarks_to_dataframe(self) -> pd.DataFrame:
+		"""the service remarks in long format, one row per remark"""
+		return self._repeated_to_dataframe('remarks', {
+			'qual': attrgetter('qualifier.code'),
+			'code': attrgetter('code.code'),
+		})
+
+	def _repeated_to_dataframe(self, attribute: str, fields: Dict[str, Callable[[Any], Any]]) -> pd.DataFrame:
+		# service is the row of the service in to_dataframe and index its position within the service,
+		# so adj_1_code in to_dataframe is the code of the row with index 1
+		columns = {'service': [], 'marker': [], 'index': [], **{name: [] for name in fields}}
+		getters = [(columns[name], getter) for name, getter in fields.items()]
+		for row, (claim, service) in enumerate(self._claim_services()):
+			for index, item in enumerate(getattr(service, attribute)):
+				columns['service'].append(row)
+				columns['marker'].append(claim.claim.marker)
+				columns['index'].append(index)
+				for column, getter in getters:
+					column.append(getter(item))
+
+		return pd.DataFrame(columns, copy=False)
+
+	def _claim_services(self) -> List[Tuple[ClaimLoop, ServiceLoop]]:
+		return [(claim, service) for claim in self.claims for service in claim.services]
 
 	@staticmethod
 	def serialize_service(
@@ -122,496 +714,191 @@ class TransactionSet:
 
 		return datum
 
-	def to_json(self) -> Dict[str, Any]:
-		"""Convert the EDI 835 transaction set to JSON format matching the provided schema"""
-		# Parse the raw file to extract all segments
-		with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
-			file_content = f.read()
-		
-		# Check if file needs preprocessing by looking for special characters
-		needs_preprocessing = any(char in file_content for char in ['\x1d', '\x1e', '\x1f'])
-		
-		if needs_preprocessing:
-			# Apply preprocessing 
-			from edi_835_parser import preprocess_edi_content
-			file_content = preprocess_edi_content(file_content)
-			# Also try ':' as segment terminator for preprocessed content
-			segments = file_content.split(':')
-		else:
-			segments = file_content.split('~')
-		
-		segments = [segment.strip() for segment in segments if segment.strip()]
-		
-		# Initialize JSON structure
-		json_data = {
-			"interchange": {
-				"ISA": None,
-				"GS": None,
-				"transactions": [],
-				"GE": None,
-				"IEA": None
-			}
-		}
-		
-		current_transaction = None
-		current_n1_loop = None
-		current_clp_loop = None
-		current_svc_loop = None
-		
-		for segment in segments:
-			if not segment:
-				continue
-				
-			parts = split_segment(segment)
-			identifier = parts[0] if parts else ""
-			
-			if identifier == "ISA":
-				json_data["interchange"]["ISA"] = self._convert_isa_segment(segment)
-			elif identifier == "GS":
-				json_data["interchange"]["GS"] = self._convert_gs_segment(segment)
-			elif identifier == "ST":
-				current_transaction = {
-					"ST": self._convert_st_segment(segment),
-					"BPR": None,
-					"TRN": None,
-					"DTM": [],
-					"N1_loop": [],
-					"CLP_loop": [],
-					"PLB": [],
-					"SE": None
-				}
-				json_data["interchange"]["transactions"].append(current_transaction)
-			elif identifier == "BPR" and current_transaction:
-				current_transaction["BPR"] = self._convert_bpr_segment(segment)
-			elif identifier == "TRN" and current_transaction:
-				current_transaction["TRN"] = self._convert_trn_segment(segment)
-			elif identifier == "DTM" and current_transaction:
-				dtm_data = self._convert_dtm_segment(segment)
-				if current_svc_loop:
-					# DTM within service loop goes to service level
-					if "DTM" not in current_svc_loop:
-						current_svc_loop["DTM"] = []
-					current_svc_loop["DTM"].append(dtm_data)
-				elif current_clp_loop:
-					# DTM within claim loop (but no service yet) goes to claim level
-					current_clp_loop["DTM"].append(dtm_data)
-				else:
-					# DTM at transaction level goes to transaction level
-					current_transaction["DTM"].append(dtm_data)
-			elif identifier == "N1" and current_transaction:
-				current_n1_loop = {
-					"N1": self._convert_n1_segment(segment),
-					"N3": None,
-					"N4": None,
-					"PER": None
-				}
-				current_transaction["N1_loop"].append(current_n1_loop)
-			elif identifier == "N3" and current_n1_loop:
-				current_n1_loop["N3"] = self._convert_n3_segment(segment)
-			elif identifier == "N4" and current_n1_loop:
-				current_n1_loop["N4"] = self._convert_n4_segment(segment)
-			elif identifier == "PER" and current_n1_loop:
-				current_n1_loop["PER"] = self._convert_per_segment(segment)
-			elif identifier == "REF" and current_transaction:
-				ref_data = self._convert_ref_segment(segment)
-				if current_svc_loop:
-					if "REF" not in current_svc_loop:
-						current_svc_loop["REF"] = []
-					current_svc_loop["REF"].append(ref_data)
-				elif current_clp_loop:
-					if "REF" not in current_clp_loop:
-						current_clp_loop["REF"] = []
-					current_clp_loop["REF"].append(ref_data)
-			elif identifier == "LX" and current_transaction:
-				# LX starts a new claim grouping - this is handled within CLP loop
-				pass
-			elif identifier == "CLP" and current_transaction:
-				current_clp_loop = {
-					"CLP": self._convert_clp_segment(segment),
-					"CAS": [],
-					"NM1": [],
-					"DTM": [],
-					"AMT": [],
-					"REF": [],
-					"SVC_loop": []
-				}
-				current_transaction["CLP_loop"].append(current_clp_loop)
-				current_svc_loop = None
-			elif identifier == "CAS" and current_clp_loop:
-				if current_svc_loop:
-					if "CAS" not in current_svc_loop:
-						current_svc_loop["CAS"] = []
-					current_svc_loop["CAS"].append(self._convert_cas_segment(segment))
-				else:
-					current_clp_loop["CAS"].append(self._convert_cas_segment(segment))
-			elif identifier == "NM1" and current_clp_loop:
-				current_clp_loop["NM1"].append(self._convert_nm1_segment(segment))
-			elif identifier == "AMT" and current_clp_loop:
-				if current_svc_loop:
-					if "AMT" not in current_svc_loop:
-						current_svc_loop["AMT"] = []
-					current_svc_loop["AMT"].append(self._convert_amt_segment(segment))
-				else:
-					current_clp_loop["AMT"].append(self._convert_amt_segment(segment))
-			elif identifier == "SVC" and current_clp_loop:
-				current_svc_loop = {
-					"SVC": self._convert_svc_segment(segment)
-				}
-				current_clp_loop["SVC_loop"].append(current_svc_loop)
-			elif identifier == "PLB" and current_transaction:
-				current_transaction["PLB"].append(self._convert_plb_segment(segment))
-			elif identifier == "SE" and current_transaction:
-				current_transaction["SE"] = self._convert_se_segment(segment)
-				current_transaction = None
-				current_n1_loop = None
-				current_clp_loop = None
-				current_svc_loop = None
-			elif identifier == "GE":
-				json_data["interchange"]["GE"] = self._convert_ge_segment(segment)
-			elif identifier == "IEA":
-				json_data["interchange"]["IEA"] = self._convert_iea_segment(segment)
-		
-		return json_data
-
-	def _convert_isa_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert ISA segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"authorization_information_qualifier": parts[1] if len(parts) > 1 else "",
-			"authorization_information": parts[2] if len(parts) > 2 else "",
-			"security_information_qualifier": parts[3] if len(parts) > 3 else "",
-			"security_information": parts[4] if len(parts) > 4 else "",
-			"interchange_sender_id_qualifier": parts[5] if len(parts) > 5 else "",
-			"interchange_sender_id": parts[6] if len(parts) > 6 else "",
-			"interchange_receiver_id_qualifier": parts[7] if len(parts) > 7 else "",
-			"interchange_receiver_id": parts[8] if len(parts) > 8 else "",
-			"interchange_date": parts[9] if len(parts) > 9 else "",
-			"interchange_time": parts[10] if len(parts) > 10 else "",
-			"interchange_control_standards_identifier": parts[11] if len(parts) > 11 else "",
-			"interchange_control_version_number": parts[12] if len(parts) > 12 else "",
-			"interchange_control_number": parts[13] if len(parts) > 13 else "",
-			"acknowledgement_requested": parts[14] if len(parts) > 14 else "",
-			"usage_indicator": parts[15] if len(parts) > 15 else "",
-			"component_element_separator": parts[16] if len(parts) > 16 else ""
-		}
-
-	def _convert_gs_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert GS segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"functional_identifier_code": parts[1] if len(parts) > 1 else "",
-			"application_sender_code": parts[2] if len(parts) > 2 else "",
-			"application_receiver_id": parts[3] if len(parts) > 3 else "",
-			"date": parts[4] if len(parts) > 4 else "",
-			"time": parts[5] if len(parts) > 5 else "",
-			"group_control_number": parts[6] if len(parts) > 6 else "",
-			"responsible_agency_code": parts[7] if len(parts) > 7 else "",
-			"version_release_industry_identifier": parts[8] if len(parts) > 8 else ""
-		}
-
-	def _convert_st_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert ST segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"transaction_set_identifier_code": parts[1] if len(parts) > 1 else "",
-			"transaction_set_control_number": parts[2] if len(parts) > 2 else ""
-		}
-
-	def _convert_bpr_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert BPR segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"transaction_handling_code": parts[1] if len(parts) > 1 else "",
-			"monetary_amount": parts[2] if len(parts) > 2 else "",
-			"credit_debit_flag": parts[3] if len(parts) > 3 else "",
-			"payment_method_code": parts[4] if len(parts) > 4 else "",
-			"payment_format_code": parts[5] if len(parts) > 5 else "",
-			"dfi_id_number_qualifier": parts[6] if len(parts) > 6 else "",
-			"dfi_identification_number": parts[7] if len(parts) > 7 else "",
-			"account_number_qualifier": parts[8] if len(parts) > 8 else "",
-			"sender_bank_account_number": parts[9] if len(parts) > 9 else "",
-			"originating_company_identifier": parts[10] if len(parts) > 10 else "",
-			"originating_company_supplemental_code": parts[11] if len(parts) > 11 else "",
-			"dfi_identification_number_qualifier": parts[12] if len(parts) > 12 else "",
-			"receiver_or_provider_bank_id_number": parts[13] if len(parts) > 13 else "",
-			"account_number_qualifier_2": parts[14] if len(parts) > 14 else "",
-			"receiver_or_provider_account_number": parts[15] if len(parts) > 15 else "",
-			"check_issue_or_eft_effective_date": parts[16] if len(parts) > 16 else ""
-		}
-
-	def _convert_trn_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert TRN segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"trace_type_code": parts[1] if len(parts) > 1 else "",
-			"reference_identification": parts[2] if len(parts) > 2 else "",
-			"originating_company_identifier": parts[3] if len(parts) > 3 else "",
-			"originating_company_supplemental_code": parts[4] if len(parts) > 4 else ""
-		}
+	def dump_json(self, fp: BinaryIO, subset: Optional[Iterable[str]] = None) -> None:
+		"""write the to_json structure to a binary file as the segments are walked,
+		each transaction is encoded and released once its SE segment closes it.
+		the ISA, GS, GE and IEA envelope is written after the transactions, once the last of each is known,
+		so a file with several GS groups keeps the same last values to_json does"""
+		interchange = _new_interchange()
+		transactions = interchange['transactions']
+		state = _JsonState(interchange)
+		transactions_written = 0
+
+		def write_transactions():
+			nonlocal transactions_written
+			for transaction in transactions:
+				if transactions_written:
+					fp.write(b',')
+				fp.write(_dumps(transaction))
+				transactions_written += 1
+			transactions.clear()
+
+		fp.write(b'{"interchange":{"transactions":[')
+		for _ in _place_segments(self._iter_json_segments(), state, subset):
+			write_transactions()
+
+		# also writes any transaction never closed by an SE segment
+		write_transactions()
+		fp.write(b']')
+		for key in ('ISA', 'GS', 'GE', 'IEA'):
+			fp.write(b',"' + key.encode('ascii') + b'":' + _dumps(interchange[key]))
+		fp.write(b'}}')
+
+	def dump_json_bytes(self, subset: Optional[Iterable[str]] = None) -> bytes:
+		"""the to_json structure encoded as UTF-8 JSON bytes"""
+		buffer = io.BytesIO()
+		self.dump_json(buffer, subset)
+		return buffer.getvalue()
+
+	def to_json(self, subset: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+		"""
+		Convert the EDI 835 transaction set to JSON format matching the provided schema
+
+		Args:
+			subset (Iterable[str], optional): Segment identifiers to convert, e.g. {'CLP', 'SVC', 'CAS'}
+				or a single identifier such as 'CLP'; all other segments are skipped. ST, N1, CLP, SVC and SE still open and close their loops
+				when left out, with their own values set to None
+		"""
+		return self._segments_to_json(self._iter_json_segments(), subset)
 
-	def _convert_dtm_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert DTM segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"date_time_qualifier": parts[1] if len(parts) > 1 else "",
-			"date": parts[2] if len(parts) > 2 else "",
-			"time": parts[3] if len(parts) > 3 else "",
-			"time_code": parts[4] if len(parts) > 4 else "",
-			"date_time_period_format": parts[5] if len(parts) > 5 else "",
-			"date_time_period": parts[6] if len(parts) > 6 else ""
-		}
-
-	def _convert_n1_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert N1 segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"entity_identifier_code": parts[1] if len(parts) > 1 else "",
-			"name": parts[2] if len(parts) > 2 else "",
-			"identification_code_qualifier": parts[3] if len(parts) > 3 else "",
-			"identification_code": parts[4] if len(parts) > 4 else ""
-		}
-
-	def _convert_n3_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert N3 segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"address_line_1": parts[1] if len(parts) > 1 else "",
-			"address_line_2": parts[2] if len(parts) > 2 else ""
-		}
-
-	def _convert_n4_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert N4 segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"city_name": parts[1] if len(parts) > 1 else "",
-			"state_code": parts[2] if len(parts) > 2 else "",
-			"postal_code": parts[3] if len(parts) > 3 else "",
-			"country_code": parts[4] if len(parts) > 4 else "",
-			"location_qualifier": parts[5] if len(parts) > 5 else "",
-			"location_identifier": parts[6] if len(parts) > 6 else ""
-		}
+	@classmethod
+	def file_to_json(
+			cls,
+			file_path: str,
+			preprocess: bool = False,
+			subset: Optional[Iterable[str]] = None,
+	) -> Dict[str, Any]:
+		"""the to_json structure of an EDI file, streamed in a single pass without building the claim,
+		service and organization loops, preprocess applies as it does for build"""
+		return cls._segments_to_json(cls._iter_file_segments(file_path, preprocess), subset)
 
-	def _convert_per_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert PER segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"contact_function_code": parts[1] if len(parts) > 1 else "",
-			"contact_name": parts[2] if len(parts) > 2 else "",
-			"communication_number_qualifier_1": parts[3] if len(parts) > 3 else "",
-			"communication_number_1": parts[4] if len(parts) > 4 else "",
-			"communication_number_qualifier_2": parts[5] if len(parts) > 5 else "",
-			"communication_number_2": parts[6] if len(parts) > 6 else "",
-			"communication_number_qualifier_3": parts[7] if len(parts) > 7 else "",
-			"communication_number_3": parts[8] if len(parts) > 8 else "",
-			"contact_inquiry_reference": parts[9] if len(parts) > 9 else ""
-		}
+	@staticmethod
+	def _segments_to_json(segments: Iterator[str], subset: Optional[Iterable[str]]) -> Dict[str, Any]:
+		json_data = {"interchange": _new_interchange()}
+		state = _JsonState(json_data["interchange"])
+		for _ in _place_segments(segments, state, subset):
+			pass
 
-	def _convert_ref_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert REF segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"reference_identification_qualifier": parts[1] if len(parts) > 1 else "",
-			"reference_identification": parts[2] if len(parts) > 2 else "",
-			"description": parts[3] if len(parts) > 3 else "",
-			"reference_identifier": parts[4] if len(parts) > 4 else ""
-		}
+		return json_data
 
-	def _convert_clp_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert CLP segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"patient_control_number": parts[1] if len(parts) > 1 else "",
-			"claim_status_code": parts[2] if len(parts) > 2 else "",
-			"total_claim_charge_amount": parts[3] if len(parts) > 3 else "",
-			"total_claim_payment_amount": parts[4] if len(parts) > 4 else "",
-			"patient_responsibility_amount": parts[5] if len(parts) > 5 else "",
-			"claim_filing_indicator_code": parts[6] if len(parts) > 6 else "",
-			"payer_claim_control_number": parts[7] if len(parts) > 7 else "",
-			"facility_type_code": parts[8] if len(parts) > 8 else "",
-			"claim_frequency_code": parts[9] if len(parts) > 9 else "",
-			"patient_status_code": parts[10] if len(parts) > 10 else "",
-			"diagnosis_related_group_code": parts[11] if len(parts) > 11 else "",
-			"drg_weight": parts[12] if len(parts) > 12 else "",
-			"discharge_fraction": parts[13] if len(parts) > 13 else ""
-		}
+	def _iter_json_segments(self) -> Iterator[str]:
+		if self.content is not None:
+			return self._chunk_segments(iter_chunks(self.content))
 
-	def _convert_cas_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert CAS segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"claim_adjustment_group_code": parts[1] if len(parts) > 1 else "",
-			"adjustment_reason_code": parts[2] if len(parts) > 2 else "",
-			"adjustment_amount": parts[3] if len(parts) > 3 else "",
-			"adjustment_quantity": parts[4] if len(parts) > 4 else "",
-			"adjustment_reason_code_2": parts[5] if len(parts) > 5 else "",
-			"adjustment_amount_2": parts[6] if len(parts) > 6 else "",
-			"adjustment_quantity_2": parts[7] if len(parts) > 7 else "",
-			"adjustment_reason_code_3": parts[8] if len(parts) > 8 else "",
-			"adjustment_amount_3": parts[9] if len(parts) > 9 else "",
-			"adjustment_quantity_3": parts[10] if len(parts) > 10 else "",
-			"adjustment_reason_code_4": parts[11] if len(parts) > 11 else "",
-			"adjustment_amount_4": parts[12] if len(parts) > 12 else "",
-			"adjustment_quantity_4": parts[13] if len(parts) > 13 else "",
-			"adjustment_reason_code_5": parts[14] if len(parts) > 14 else "",
-			"adjustment_amount_5": parts[15] if len(parts) > 15 else "",
-			"adjustment_quantity_5": parts[16] if len(parts) > 16 else "",
-			"adjustment_reason_code_6": parts[17] if len(parts) > 17 else "",
-			"adjustment_amount_6": parts[18] if len(parts) > 18 else "",
-			"adjustment_quantity_6": parts[19] if len(parts) > 19 else ""
-		}
+		return self._iter_file_segments(self.file_path, self.preprocess)
 
-	def _convert_nm1_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert NM1 segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"entity_identifier_code": parts[1] if len(parts) > 1 else "",
-			"entity_type_qualifier": parts[2] if len(parts) > 2 else "",
-			"last_name": parts[3] if len(parts) > 3 else "",
-			"first_name": parts[4] if len(parts) > 4 else "",
-			"middle_name": parts[5] if len(parts) > 5 else "",
-			"name_prefix": parts[6] if len(parts) > 6 else "",
-			"name_suffix": parts[7] if len(parts) > 7 else "",
-			"identification_code_qualifier": parts[8] if len(parts) > 8 else "",
-			"identification_code": parts[9] if len(parts) > 9 else "",
-			"entity_relationship_code": parts[10] if len(parts) > 10 else "",
-			"entity_identifier_code_2": parts[11] if len(parts) > 11 else "",
-			"identification_code_qualifier_2": parts[12] if len(parts) > 12 else ""
-		}
+	@classmethod
+	def _iter_file_segments(cls, file_path: str, preprocess: bool) -> Iterator[str]:
+		if preprocess:
+			yield from iter_file_segments(file_path)
+			return
 
-	def _convert_amt_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert AMT segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"amount_qualifier_code": parts[1] if len(parts) > 1 else "",
-			"monetary_amount": parts[2] if len(parts) > 2 else "",
-			"credit_debit_flag_code": parts[3] if len(parts) > 3 else ""
-		}
+		with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+			yield from cls._chunk_segments(iter_chunks(f))
 
-	def _convert_svc_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert SVC segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"service_type_code": parts[1] if len(parts) > 1 else "",
-			"charge_amount": parts[2] if len(parts) > 2 else "",
-			"payment_amount": parts[3] if len(parts) > 3 else "",
-			"revenue_code": parts[4] if len(parts) > 4 else "",
-			"units_of_service_paid": parts[5] if len(parts) > 5 else "",
-			"original_units_of_service": parts[6] if len(parts) > 6 else "",
-			"adjudicated_date": parts[7] if len(parts) > 7 else ""
-		}
-
-	def _convert_plb_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert PLB segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"provider_identifier": parts[1] if len(parts) > 1 else "",
-			"fiscal_period_date": parts[2] if len(parts) > 2 else "",
-			"provider_adjustment_identifier": parts[3] if len(parts) > 3 else "",
-			"provider_adjustment_amount": parts[4] if len(parts) > 4 else "",
-			"provider_adjustment_identifier_2": parts[5] if len(parts) > 5 else "",
-			"provider_adjustment_amount_2": parts[6] if len(parts) > 6 else ""
-		}
+	@staticmethod
+	def _chunk_segments(chunks: Iterator[str]) -> Iterator[str]:
+		# Check if content needs preprocessing by looking for special characters in the first chunk,
+		# preprocessed files use them as their element separator so they show up in the ISA segment
+		first_chunk = next(chunks, '')
+		chunks = chain((first_chunk,), chunks)
+		needs_preprocessing = SPECIAL_CHARACTERS.search(first_chunk) is not None
+		
+		if needs_preprocessing:
+			# Apply preprocessing, character replacements are safe to apply chunk by chunk
+			from edi_835_parser import preprocess_edi_content
+			chunks = map(preprocess_edi_content, chunks)
+			# Also try ':' as segment terminator for preprocessed content
+			terminator = ':'
+		else:
+			terminator = '~'
+		
+		return iter_segments(chunks, terminator)
 
-	def _convert_se_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert SE segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"number_of_included_segments": parts[1] if len(parts) > 1 else "",
-			"transaction_set_control_number": parts[2] if len(parts) > 2 else ""
-		}
+	@classmethod
+	def build(cls, file_path: str, preprocess: bool = False) -> 'TransactionSet':
+		"""build a transaction set by streaming the file's segments rather than reading it whole,
+		with preprocess a file using the control character separators is translated as it is read"""
+		if preprocess:
+			return cls._build(iter_file_segments(file_path), file_path, preprocess=True)
 
-	def _convert_ge_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert GE segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"number_of_transaction_sets_included": parts[1] if len(parts) > 1 else "",
-			"group_control_number": parts[2] if len(parts) > 2 else ""
-		}
+		with open(file_path) as f:
+			return cls._build(iter_segments(iter_chunks(f)), file_path)
 
-	def _convert_iea_segment(self, segment: str) -> Dict[str, str]:
-		"""Convert IEA segment to JSON format"""
-		parts = split_segment(segment)
-		return {
-			"number_of_included_functional_groups": parts[1] if len(parts) > 1 else "",
-			"interchange_control_number": parts[2] if len(parts) > 2 else ""
-		}
+	@classmethod
+	def build_from_string(cls, content: str, file_path: Optional[str] = None) -> 'TransactionSet':
+		"""build a transaction set from EDI content already in memory, file_path is only kept for reference"""
+		# tokenized like files are, the terminators are still found natively by str.split within each chunk
+		return cls._build(iter_segments(iter_chunks(content)), file_path, content)
 
 	@classmethod
-	def build(cls, file_path: str) -> 'TransactionSet':
+	def _build(
+			cls,
+			segments: Iterator[str],
+			file_path: Optional[str],
+			content: Optional[str] = None,
+			preprocess: bool = False,
+	) -> 'TransactionSet':
 		interchange = None
 		financial_information = None
 		trace = None
 		claims = []
 		organizations = []
 
-		with open(file_path) as f:
-			file = f.read()
-
-		segments = file.split('~')
-		segments = [segment.strip() for segment in segments]
-
-		segments = iter(segments)
-		segment = None
-
-		while True:
-			response = cls.build_attribute(segment, segments)
-			segment = response.segment
-			segments = response.segments
+		segment = next(segments, None)
 
-			# no more segments to parse
-			if response.segments is None:
-				break
+		# each attribute hands back the segment after it, None once every segment has been consumed
+		while segment is not None:
+			key, value, segment = cls.build_attribute(segment, segments)
 
-			if response.key == 'interchange':
-				interchange = response.value
+			if key == 'interchange':
+				interchange = value
 
-			if response.key == 'financial information':
-				financial_information = response.value
+			elif key == 'financial information':
+				financial_information = value
 
-			if response.key == 'trace':
-				trace = response.value
+			elif key == 'trace':
+				trace = value
 
-			if response.key == 'organization':
-				organizations.append(response.value)
+			elif key == 'organization':
+				organizations.append(value)
 
-			if response.key == 'claim':
-				claims.append(response.value)
+			elif key == 'claim':
+				claims.append(value)
 
-		return TransactionSet(interchange, financial_information, trace, claims, organizations, file_path)
+		return TransactionSet(
+			interchange, financial_information, trace, claims, organizations, file_path, content, preprocess
+		)
 
 	@classmethod
-	def build_attribute(cls, segment: Optional[str], segments: Iterator[str]) -> BuildAttributeResponse:
-		if segment is None:
-			try:
-				segment = segments.__next__()
-			except StopIteration:
-				return BuildAttributeResponse(None, None, None, None)
-
+	def build_attribute(cls, segment: str, segments: Iterator[str]) -> Tuple[Optional[str], Any, Optional[str]]:
+		"""build the attribute starting at segment, returning its key, its value and the following segment"""
 		identifier = find_identifier(segment)
 
 		if identifier == InterchangeSegment.identification:
-			interchange = InterchangeSegment(segment)
-			return BuildAttributeResponse('interchange', interchange, None, segments)
+			return 'interchange', InterchangeSegment(segment), next(segments, None)
 
 		if identifier == FinancialInformationSegment.identification:
-			financial_information = FinancialInformationSegment(segment)
-			return BuildAttributeResponse('financial information', financial_information, None, segments)
+			return 'financial information', FinancialInformationSegment(segment), next(segments, None)
 
 		if identifier == TraceSegment.identification:
-			trace = TraceSegment(segment)
-			return BuildAttributeResponse('trace', trace, None, segments)
+			return 'trace', TraceSegment(segment), next(segments, None)
 
 		if identifier == OrganizationLoop.initiating_identifier:
-			organization, segments, segment = OrganizationLoop.build(segment, segments)
-			return BuildAttributeResponse('organization', organization, segment, segments)
+			organization, remaining, segment = OrganizationLoop.build(segment, segments)
+			# a loop still open when the segments run out is discarded
+			if remaining is None:
+				return None, None, None
+			return 'organization', organization, segment
 
 		elif identifier == ClaimLoop.initiating_identifier:
-			claim, segments, segment = ClaimLoop.build(segment, segments)
-			return BuildAttributeResponse('claim', claim, segment, segments)
+			claim, remaining, segment = ClaimLoop.build(segment, segments)
+			if remaining is None:
+				return None, None, None
+			return 'claim', claim, segment
 
 		else:
-			return BuildAttributeResponse(None, None, None, segments)
-
+			return None, None, next(segments, None)
 
 if __name__ == '__main__':
 	pass
\ No newline at end of file
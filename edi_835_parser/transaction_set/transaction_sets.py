@@ -1,4 +1,4 @@
-from typing import List, Iterable
+from typing import List, Iterable, Callable
 
 import pandas as pd
 
@@ -19,14 +19,38 @@ class TransactionSets:
 	def __repr__(self):
 		return '\n'.join(str(transaction_set) for transaction_set in self)
 
-	def to_dataframe(self) -> pd.DataFrame:
+	def to_dataframe(self, repeated_columns: bool = True) -> pd.DataFrame:
 		data = pd.DataFrame()
 		for transaction_set in self:
-			data = pd.concat([data, transaction_set.to_dataframe()])
+			data = pd.concat([data, transaction_set.to_dataframe(repeated_columns)])
 
 		data = TransactionSets.sort_columns(data)
 		return data
 
+	def adjustments_to_dataframe(self) -> pd.DataFrame:
+		return self._concat_repeated(TransactionSet.adjustments_to_dataframe)
+
+	def references_to_dataframe(self) -> pd.DataFrame:
+		return self._concat_repeated(TransactionSet.references_to_dataframe)
+
+	def remarks_to_dataframe(self) -> pd.DataFrame:
+		return self._concat_repeated(TransactionSet.remarks_to_dataframe)
+
+	def _concat_repeated(self, to_dataframe: Callable[[TransactionSet], pd.DataFrame]) -> pd.DataFrame:
+		# offset each transaction set's service rows so service stays the row position in to_dataframe
+		frames = []
+		offset = 0
+		for transaction_set in self:
+			data = to_dataframe(transaction_set)
+			data['service'] += offset
+			frames.append(data)
+			offset += sum(len(claim.services) for claim in transaction_set.claims)
+
+		if not frames:
+			return pd.DataFrame()
+
+		return pd.concat(frames, ignore_index=True)
+
 	@staticmethod
 	def sort_columns(data: pd.DataFrame) -> pd.DataFrame:
 		substrings = ['adj', 'ref', 'rem']
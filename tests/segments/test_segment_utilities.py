@@ -0,0 +1,20 @@
+from edi_835_parser.segments.utilities import iter_chunks, iter_segments, find_identifier, split_segment
+
+
+def test_iter_segments():
+    content = 'ST*835*0001~\nBPR*I*100~\n\n~TRN*1*12345~\n'
+
+    for chunk_size in (1, 3, 7, 64):
+        segments = list(iter_segments(iter_chunks(content, chunk_size)))
+        assert segments == [segment.strip() for segment in content.split('~')]
+
+
+def test_find_identifier():
+    assert find_identifier('CLP*123*1*100') == 'CLP'
+    assert find_identifier('N1|PR|PAYER') == 'N1'
+    assert find_identifier('LX') == 'LX'
+    assert find_identifier('') == ''
+
+    # more pipes than asterisks, so the segment is split on pipes like split_segment does
+    segment = 'N1*PR*ACME|INC|WEST|DIV'
+    assert find_identifier(segment) == split_segment(segment)[0] == 'N1*PR*ACME'
@@ -1,3 +1,11 @@
+import json
+
+import pandas as pd
+import pytest
+
+import edi_835_parser
+from edi_835_parser.transaction_set.transaction_set import TransactionSet
+from edi_835_parser.transaction_set.transaction_sets import TransactionSets
 from tests.conftest import current_path
 
 def test_claim_count(
@@ -56,3 +64,100 @@ def test_to_dataframe(
 	assert payment == all_data['paid_amount'].sum().round(2)
 
 	all_data.to_csv(f'{current_path}/output/all_samples.csv')
+
+
+def test_preprocess_edi_content():
+	content = 'ST\x1d835\x1d0001\x1eBPR\x1dI\x1f\nTRN\x1d1\n'
+	assert edi_835_parser.preprocess_edi_content(content) == 'ST*835*0001~BPR*I:TRN*1'
+
+
+def test_dump_json(blue_cross_nc_sample):
+	transaction_set = blue_cross_nc_sample.transaction_sets[0]
+	assert json.loads(transaction_set.dump_json_bytes()) == transaction_set.to_json()
+
+
+def test_dump_json_multiple_groups():
+	with open(f'{current_path}/test_edi_835_files/blue_cross_nc_sample.txt') as f:
+		body = f.read().strip()
+
+	content = (
+		'ISA*00*1234567890*00*1234567890*14*7906630900001  *30*251729714      *240817*2144*^*00501*000000357*0*P*:~'
+		f'GS*HP*7906630900001*251729714*20240817*2144*357*X*005010X221A1~{body}GE*1*357~'
+		f'GS*HP*7906630900001*251729714*20240817*2144*358*X*005010X221A1~{body}GE*1*358~'
+		'IEA*2*000000357~'
+	)
+	transaction_set = TransactionSet.build_from_string(content)
+	json_data = transaction_set.to_json()
+
+	assert len(json_data['interchange']['transactions']) == 2
+	assert json_data['interchange']['GS']['group_control_number'] == '358'
+	assert json.loads(transaction_set.dump_json_bytes()) == json_data
+
+
+def test_build_from_string(blue_cross_nc_sample):
+	with open(f'{current_path}/test_edi_835_files/blue_cross_nc_sample.txt') as f:
+		transaction_set = TransactionSet.build_from_string(f.read())
+
+	assert transaction_set.file_path is None
+	assert transaction_set.to_json() == blue_cross_nc_sample.transaction_sets[0].to_json()
+
+
+def test_file_to_json(blue_cross_nc_sample):
+	transaction_set = blue_cross_nc_sample.transaction_sets[0]
+	assert TransactionSet.file_to_json(transaction_set.file_path) == transaction_set.to_json()
+	assert edi_835_parser.parse_to_json(transaction_set.file_path) == transaction_set.to_json()
+
+
+def test_to_json_subset(blue_cross_nc_sample):
+	transaction_set = blue_cross_nc_sample.transaction_sets[0]
+	full = transaction_set.to_json()['interchange']['transactions'][0]
+	subset = transaction_set.to_json(subset={'CLP', 'SVC'})['interchange']['transactions'][0]
+
+	assert subset['ST'] is None and subset['BPR'] is None
+	assert [loop['CLP'] for loop in subset['CLP_loop']] == [loop['CLP'] for loop in full['CLP_loop']]
+	assert subset['CLP_loop'][0]['SVC_loop'][0] == {'SVC': full['CLP_loop'][0]['SVC_loop'][0]['SVC']}
+
+	single = transaction_set.to_json(subset='CLP')['interchange']['transactions'][0]
+	assert [loop['CLP'] for loop in single['CLP_loop']] == [loop['CLP'] for loop in full['CLP_loop']]
+
+
+def test_repeated_to_dataframe(united_healthcare_legacy_sample):
+	transaction_set = united_healthcare_legacy_sample.transaction_sets[0]
+	data = transaction_set.to_dataframe()
+	adjustments = transaction_set.adjustments_to_dataframe()
+
+	assert 'adj_0_code' not in transaction_set.to_dataframe(repeated_columns=False).columns
+	assert len(adjustments) == data.filter(regex=r'^adj_\d+_code$').notna().sum().sum()
+	for _, adjustment in adjustments.iterrows():
+		assert data.at[adjustment['service'], f"adj_{adjustment['index']}_code"] == adjustment['code']
+
+
+def test_to_dataframe_arrow_strings(united_healthcare_legacy_sample):
+	pytest.importorskip('pyarrow')
+	data = united_healthcare_legacy_sample.transaction_sets[0].to_dataframe()
+
+	for column in ('marker', 'code', 'adj_0_code'):
+		assert isinstance(data[column].dtype, pd.StringDtype)
+		assert data[column].dtype.storage == 'pyarrow'
+
+
+def test_payer_and_payee(united_healthcare_legacy_sample):
+	transaction_set = united_healthcare_legacy_sample.transaction_sets[0]
+
+	assert transaction_set.payer.organization.type == 'payer'
+	assert transaction_set.payer.organization.name == 'UNITED HEALTHCARE INSURANCE COMPANY'
+	assert transaction_set.payee.organization.type == 'payee'
+	assert transaction_set.payee.organization.name == 'KLAUS MEDICAL CENTER'
+
+
+def test_transaction_sets_repeated_to_dataframe(united_healthcare_legacy_sample):
+	transaction_set = united_healthcare_legacy_sample.transaction_sets[0]
+	transaction_sets = TransactionSets([transaction_set, transaction_set])
+	data = transaction_sets.to_dataframe()
+	adjustments = transaction_sets.adjustments_to_dataframe()
+
+	assert len(adjustments) == 2 * len(transaction_set.adjustments_to_dataframe())
+	assert adjustments['service'].max() >= len(transaction_set.to_dataframe())
+	for _, adjustment in adjustments.iterrows():
+		row = data.iloc[adjustment['service']]
+		assert row[f"adj_{adjustment['index']}_code"] == adjustment['code']